@@ -26,6 +26,9 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Extensions the models depend on (trigram index on task titles)
+CREATE_EXTENSIONS = "CREATE EXTENSION IF NOT EXISTS pg_trgm"
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -53,6 +56,7 @@ def run_migrations_offline() -> None:
     )
 
     with context.begin_transaction():
+        context.execute(CREATE_EXTENSIONS)
         context.run_migrations()
 
 
@@ -75,6 +79,7 @@ def run_migrations_online() -> None:
         )
 
         with context.begin_transaction():
+            context.execute(CREATE_EXTENSIONS)
             context.run_migrations()
 
 
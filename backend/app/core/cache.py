@@ -0,0 +1,85 @@
+import functools
+import hashlib
+import json
+import logging
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Cached task responses carry their owner's generation in the key. Writes bump
+# the generation, so responses built from older data are never read again and
+# simply expire. The counter outlives any cached response by a wide margin.
+GENERATION_TTL = 24 * 60 * 60
+
+def task_generation_key(user_id: int) -> str:
+    """Key of the counter bumped whenever a user's tasks change."""
+    return f"tasks_gen:{user_id}"
+
+async def get_task_generation(redis, user_id: int) -> int:
+    """Current cache generation of a user's tasks."""
+    generation = await redis.get(task_generation_key(user_id))
+    return int(generation) if generation is not None else 0
+
+def task_cache_key(user_id: int, generation: int, prefix: str, params: dict) -> str:
+    """Build a cache key scoped to a task owner and generation."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"tasks:{user_id}:{generation}:{prefix}:{digest}"
+
+async def invalidate_task_cache(redis, user_id: int) -> None:
+    """Move a user to a new generation, orphaning every cached task response.
+    
+    Redis failures are logged rather than raised: callers invalidate after
+    committing, and the write must not be reported as failed.
+    """
+    key = task_generation_key(user_id)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, GENERATION_TTL)
+            await pipe.execute()
+    except RedisError:
+        logger.warning("Failed to invalidate task cache for user %s", user_id, exc_info=True)
+
+def redis_cached(prefix: str, ttl: int = 60):
+    """Cache a task endpoint's JSON response in Redis per owner and query.
+    
+    The endpoint must declare ``redis`` and ``user_id`` parameters; every
+    other parameter except ``db`` becomes part of the cache key. The
+    generation is read before the endpoint queries the database, so a
+    response racing a write is stored under the generation the write retires.
+    When Redis is unavailable the endpoint is served uncached.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            redis = kwargs["redis"]
+            user_id = kwargs["user_id"]
+            params = {name: value for name, value in kwargs.items() if name not in ("redis", "user_id", "db")}
+            try:
+                generation = await get_task_generation(redis, user_id)
+                key = task_cache_key(user_id, generation, prefix, params)
+                cached = await redis.get(key)
+            except RedisError:
+                logger.warning("Task cache read failed; serving uncached", exc_info=True)
+                key = cached = None
+            
+            if cached is not None:
+                return Response(content=cached, media_type="application/json")
+            
+            result = await func(**kwargs)
+            if isinstance(result, BaseModel):
+                result = result.model_dump(mode="json")
+            # UTC as "Z", matching how pydantic writes the single-task endpoints
+            content = orjson.dumps(result, option=orjson.OPT_UTC_Z)
+            
+            if key is not None:
+                try:
+                    await redis.setex(key, ttl, content)
+                except RedisError:
+                    logger.warning("Task cache write failed", exc_info=True)
+            return Response(content=content, media_type="application/json")
+        return wrapper
+    return decorator
@@ -1,16 +1,11 @@
 import redis.asyncio as redis
+from fastapi import Request
 from app.core.config import settings
 
-redis_client = None
+def create_redis() -> redis.Redis:
+    """Create the shared Redis client; called once from the app lifespan."""
+    return redis.from_url(settings.REDIS_URL, max_connections=100)
 
-async def get_redis():
-    global redis_client
-    if redis_client is None:
-        redis_client = await redis.from_url(settings.REDIS_URL)
-    return redis_client
-
-async def close_redis():
-    global redis_client
-    if redis_client:
-        await redis_client.close()
-        redis_client = None
+async def get_redis(request: Request) -> redis.Redis:
+    """Dependency returning the Redis client created at startup."""
+    return request.app.state.redis
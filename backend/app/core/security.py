@@ -1,19 +1,36 @@
+import asyncio
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# argon2id for new hashes; bcrypt hashes still verify and are upgraded on login
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=64 * 1024,
+    argon2__parallelism=1,
+)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Resolved once so token encoding and decoding skip the settings lookups
+_KEY = settings.SECRET_KEY
+_ALGS = [settings.ALGORITHM]
+_DECODE_OPTIONS = {"verify_exp": True, "require_exp": True}
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password off the event loop, returning a replacement hash if the stored one is outdated."""
+    return await asyncio.to_thread(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop."""
+    return await asyncio.to_thread(pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
@@ -23,32 +40,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # iat keeps sub-second precision so revocation compares exactly against it
+    to_encode.update({"exp": expire, "iat": time.time(), "type": "access"})
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=_ALGS[0])
     return encoded_jwt
 
 def create_refresh_token(data: dict):
     """Create a JWT refresh token."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # A random jti keeps tokens issued to a user within the same second distinct
+    to_encode.update({"exp": expire, "type": "refresh", "jti": secrets.token_urlsafe(16)})
+    encoded_jwt = jwt.encode(to_encode, _KEY, algorithm=_ALGS[0])
     return encoded_jwt
 
+def hash_token(token: str) -> str:
+    """Return the SHA-256 hex digest used to store and look up tokens."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 def verify_token(token: str, token_type: str = "access") -> dict:
-    """Verify and decode a JWT token."""
+    """Verify and decode a JWT token in a single pass."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        if payload.get("type") != token_type:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return payload
+        payload = jwt.decode(token, _KEY, algorithms=_ALGS, options=_DECODE_OPTIONS)
     except JWTError:
+        payload = None
+    
+    if not payload or payload.get("user_id") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if payload.get("type") != token_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
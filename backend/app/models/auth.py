@@ -1,13 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_revoked_expires", "user_id", "is_revoked", "expires_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True, nullable=False)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 of the token
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     is_revoked = Column(Boolean, default=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -18,6 +21,9 @@ class RefreshToken(Base):
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_user_active", "user_id", "is_active"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, unique=True, index=True, nullable=False)
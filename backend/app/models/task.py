@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Index, DDL, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -18,9 +18,15 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_owner_status_priority", "owner_id", "status", "priority"),
+        Index("ix_tasks_owner_status_created", "owner_id", "status", "created_at"),
+        Index("ix_tasks_owner_priority", "owner_id", "priority"),
+        Index("ix_tasks_owner_created", "owner_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, nullable=False, index=True)
+    title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(Enum(TaskStatus), default=TaskStatus.TODO, nullable=False)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
@@ -34,3 +40,13 @@ class Task(Base):
     
     # Relationships
     owner = relationship("User", back_populates="tasks")
+
+# Trigram index so the substring title search can avoid a sequential scan
+Index(
+    "ix_tasks_title_trgm",
+    func.lower(Task.title).label("title_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"title_lower": "gin_trgm_ops"},
+)
+
+event.listen(Task.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
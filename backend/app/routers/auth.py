@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+import asyncio
 import secrets
-import httpx
+import time
+from cachetools import TTLCache
+from sqlalchemy.orm import make_transient_to_detached
 from authlib.integrations.fastapi_oauth2 import GoogleOAuth2, GitHubOAuth2
 
 from app.database import get_db
@@ -12,10 +17,11 @@ from app.models.auth import RefreshToken, Session
 from app.schemas.auth import Token, TokenData, RefreshTokenRequest, PasswordReset, PasswordResetConfirm
 from app.schemas.user import UserCreate, UserLogin, UserOAuth
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_and_update_password, 
+    hash_password, 
     create_access_token, 
     create_refresh_token,
+    hash_token,
     verify_token
 )
 from app.core.config import settings
@@ -36,63 +42,123 @@ github_oauth = GitHubOAuth2(
     redirect_uri="http://localhost:3000/auth/callback/github"
 )
 
-def get_current_user(
+# Verified access token payloads, keyed by SHA-256 of the token. Entries also
+# hold a detached snapshot of the user once get_current_user has loaded it.
+_token_cache = TTLCache(maxsize=10000, ttl=30)
+
+# Per-user revocation times as float seconds, matching the sub-second iat claim
+# of access tokens; tokens issued earlier are rejected. Entries outlive any
+# token they can reject.
+_revoked_at = TTLCache(maxsize=100000, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def _snapshot_user(user: User) -> User:
+    """Copy a loaded user into a detached instance safe to share across sessions."""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop cached tokens for a user whose row has changed."""
+    for key, (payload, _) in list(_token_cache.items()):
+        if payload["user_id"] == user_id:
+            _token_cache.pop(key, None)
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Reject every access token issued to the user so far."""
+    _revoked_at[user_id] = time.time()
+    invalidate_user_cache(user_id)
+
+def _is_revoked(payload: dict) -> bool:
+    """Whether the token was issued before its user's tokens were last revoked."""
+    return payload.get("iat", 0) < _revoked_at.get(payload["user_id"], 0)
+
+def _authenticate(token: str):
+    """Return the cache key and (payload, user snapshot) entry for an access token."""
+    key = hash_token(token)
+    
+    cached = _token_cache.get(key)
+    if cached:
+        if cached[0]["exp"] > time.time():
+            return key, cached
+        _token_cache.pop(key, None)
+    
+    payload = verify_token(token)
+    if _is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    entry = (payload, None)
+    _token_cache[key] = entry
+    return key, entry
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    """Get the authenticated user's id from the token claims without a database lookup."""
+    _, (payload, _) = _authenticate(credentials.credentials)
+    return payload["user_id"]
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user."""
-    token = credentials.credentials
-    payload = verify_token(token)
-    user_id = payload.get("user_id")
+    key, (payload, snapshot) = _authenticate(credentials.credentials)
+    if snapshot is not None:
+        # Attach a copy to this session without issuing a SELECT
+        return await db.merge(snapshot, load=False)
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, payload["user_id"])
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
+    
+    # Logout, deactivation or a profile change may have dropped the entry while
+    # the user loaded; caching the snapshot then would resurrect it
+    if key in _token_cache and not _is_revoked(payload):
+        _token_cache[key] = (payload, _snapshot_user(user))
     return user
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
-    # Check if user already exists
-    existing_user = db.query(User).filter(
-        (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    # Create new user, relying on the unique email/username constraints
+    # instead of probing for an existing user first
+    hashed_password = await hash_password(user_data.password)
+    user = await db.scalar(
+        pg_insert(User).values(
+            email=user_data.email,
+            username=user_data.username,
+            full_name=user_data.full_name,
+            hashed_password=hashed_password,
+            provider="local"
+        ).on_conflict_do_nothing().returning(User)
+    )
     
-    if existing_user:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email or username already registered"
         )
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    user = User(
-        email=user_data.email,
-        username=user_data.username,
-        full_name=user_data.full_name,
-        hashed_password=hashed_password,
-        provider="local"
-    )
-    
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    
     # Create tokens
     access_token = create_access_token({"user_id": user.id, "email": user.email})
     refresh_token = create_refresh_token({"user_id": user.id})
     
     # Store refresh token
-    refresh_token_obj = RefreshToken(
-        token=refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_token(refresh_token),
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
     )
-    db.add(refresh_token_obj)
-    db.commit()
+    await db.commit()
     
     return {
         "access_token": access_token,
@@ -101,11 +167,15 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user with email and password."""
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = await db.scalar(select(User).where(User.email == user_data.email))
     
-    if not user or not user.hashed_password or not verify_password(user_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user and user.hashed_password:
+        valid, new_hash = await verify_and_update_password(user_data.password, user.hashed_password)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -117,22 +187,24 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
             detail="Account is deactivated"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login, rehashing legacy bcrypt passwords with argon2
+    user.last_login = datetime.now(timezone.utc)
+    if new_hash:
+        user.hashed_password = new_hash
     
     # Create tokens
     access_token = create_access_token({"user_id": user.id, "email": user.email})
     refresh_token = create_refresh_token({"user_id": user.id})
     
     # Store refresh token
-    refresh_token_obj = RefreshToken(
-        token=refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_token(refresh_token),
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
     )
-    db.add(refresh_token_obj)
-    db.commit()
+    await db.commit()
     
     return {
         "access_token": access_token,
@@ -141,18 +213,20 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(get_db)):
+async def refresh_token(token_data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     """Refresh access token using refresh token."""
     payload = verify_token(token_data.refresh_token, "refresh")
     user_id = payload.get("user_id")
     
     # Check if refresh token exists and is not revoked
-    refresh_token_obj = db.query(RefreshToken).filter(
-        RefreshToken.token == token_data.refresh_token,
-        RefreshToken.user_id == user_id,
-        RefreshToken.is_revoked == False,
-        RefreshToken.expires_at > datetime.utcnow()
-    ).first()
+    refresh_token_obj = await db.scalar(
+        select(RefreshToken).where(
+            RefreshToken.token_hash == hash_token(token_data.refresh_token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False,
+            RefreshToken.expires_at > datetime.now(timezone.utc)
+        )
+    )
     
     if not refresh_token_obj:
         raise HTTPException(
@@ -164,18 +238,24 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
     refresh_token_obj.is_revoked = True
     
     # Create new tokens
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive"
+        )
     access_token = create_access_token({"user_id": user.id, "email": user.email})
     new_refresh_token = create_refresh_token({"user_id": user.id})
     
     # Store new refresh token
-    new_refresh_token_obj = RefreshToken(
-        token=new_refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_token(new_refresh_token),
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
     )
-    db.add(new_refresh_token_obj)
-    db.commit()
+    await db.commit()
     
     return {
         "access_token": access_token,
@@ -185,23 +265,28 @@ async def refresh_token(token_data: RefreshTokenRequest, db: Session = Depends(g
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Logout user and revoke refresh tokens."""
     # Revoke all refresh tokens for the user
-    db.query(RefreshToken).filter(
-        RefreshToken.user_id == current_user.id,
-        RefreshToken.is_revoked == False
-    ).update({"is_revoked": True})
+    await db.execute(
+        update(RefreshToken).where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False
+        ).values(is_revoked=True).execution_options(synchronize_session=False)
+    )
     
     # Revoke all sessions for the user
-    db.query(Session).filter(
-        Session.user_id == current_user.id,
-        Session.is_active == True
-    ).update({"is_active": False})
+    await db.execute(
+        update(Session).where(
+            Session.user_id == user_id,
+            Session.is_active == True
+        ).values(is_active=False).execution_options(synchronize_session=False)
+    )
     
-    db.commit()
+    await db.commit()
+    revoke_user_tokens(user_id)
     return {"message": "Successfully logged out"}
 
 @router.get("/google")
@@ -210,7 +295,7 @@ async def google_login():
     return {"url": google_oauth.get_authorize_url()}
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(request: Request, db: AsyncSession = Depends(get_db)):
     """Handle Google OAuth callback."""
     code = request.query_params.get("code")
     if not code:
@@ -220,43 +305,42 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
     token = await google_oauth.get_access_token(code)
     
     # Get user info from Google
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {token['access_token']}"}
-        )
-        user_info = response.json()
+    response = await request.app.state.http.get(
+        "https://www.googleapis.com/oauth2/v2/userinfo",
+        headers={"Authorization": f"Bearer {token['access_token']}"}
+    )
+    user_info = response.json()
     
     # Check if user exists
-    user = db.query(User).filter(User.email == user_info["email"]).first()
+    user = await db.scalar(select(User).where(User.email == user_info["email"]))
     
     if not user:
         # Create new user
-        user = User(
-            email=user_info["email"],
-            username=user_info["email"].split("@")[0],
-            full_name=user_info.get("name"),
-            avatar_url=user_info.get("picture"),
-            provider="google",
-            provider_id=user_info["id"],
-            is_verified=True
+        user = await db.scalar(
+            insert(User).values(
+                email=user_info["email"],
+                username=user_info["email"].split("@")[0],
+                full_name=user_info.get("name"),
+                avatar_url=user_info.get("picture"),
+                provider="google",
+                provider_id=user_info["id"],
+                is_verified=True
+            ).returning(User)
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     
     # Create tokens
     access_token = create_access_token({"user_id": user.id, "email": user.email})
     refresh_token = create_refresh_token({"user_id": user.id})
     
     # Store refresh token
-    refresh_token_obj = RefreshToken(
-        token=refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_token(refresh_token),
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
     )
-    db.add(refresh_token_obj)
-    db.commit()
+    await db.commit()
     
     return {
         "access_token": access_token,
@@ -270,7 +354,7 @@ async def github_login():
     return {"url": github_oauth.get_authorize_url()}
 
 @router.get("/github/callback")
-async def github_callback(request: Request, db: Session = Depends(get_db)):
+async def github_callback(request: Request, db: AsyncSession = Depends(get_db)):
     """Handle GitHub OAuth callback."""
     code = request.query_params.get("code")
     if not code:
@@ -279,44 +363,54 @@ async def github_callback(request: Request, db: Session = Depends(get_db)):
     # Exchange code for token
     token = await github_oauth.get_access_token(code)
     
-    # Get user info from GitHub
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.github.com/user",
-            headers={"Authorization": f"Bearer {token['access_token']}"}
+    # Get user info and email addresses from GitHub in parallel
+    client = request.app.state.http
+    headers = {"Authorization": f"Bearer {token['access_token']}"}
+    user_response, emails_response = await asyncio.gather(
+        client.get("https://api.github.com/user", headers=headers),
+        client.get("https://api.github.com/user/emails", headers=headers)
+    )
+    user_info = user_response.json()
+    
+    # The profile email is null when the user keeps it private
+    if not user_info.get("email") and emails_response.status_code == 200:
+        user_info["email"] = next(
+            (e["email"] for e in emails_response.json() if e.get("primary") and e.get("verified")),
+            None
         )
-        user_info = response.json()
+    if not user_info.get("email"):
+        raise HTTPException(status_code=400, detail="No verified email available from GitHub")
     
     # Check if user exists
-    user = db.query(User).filter(User.email == user_info["email"]).first()
+    user = await db.scalar(select(User).where(User.email == user_info["email"]))
     
     if not user:
         # Create new user
-        user = User(
-            email=user_info["email"],
-            username=user_info["login"],
-            full_name=user_info.get("name"),
-            avatar_url=user_info.get("avatar_url"),
-            provider="github",
-            provider_id=str(user_info["id"]),
-            is_verified=True
+        user = await db.scalar(
+            insert(User).values(
+                email=user_info["email"],
+                username=user_info["login"],
+                full_name=user_info.get("name"),
+                avatar_url=user_info.get("avatar_url"),
+                provider="github",
+                provider_id=str(user_info["id"]),
+                is_verified=True
+            ).returning(User)
         )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
     
     # Create tokens
     access_token = create_access_token({"user_id": user.id, "email": user.email})
     refresh_token = create_refresh_token({"user_id": user.id})
     
     # Store refresh token
-    refresh_token_obj = RefreshToken(
-        token=refresh_token,
-        user_id=user.id,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    await db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_token(refresh_token),
+            user_id=user.id,
+            expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        )
     )
-    db.add(refresh_token_obj)
-    db.commit()
+    await db.commit()
     
     return {
         "access_token": access_token,
@@ -1,219 +1,308 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, update, delete, desc, asc, func, tuple_
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+import base64
+import json
+import logging
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from app.database import get_db
-from app.models.user import User
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskListResponse
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user_id
+from app.core.redis_client import get_redis
+from app.core.cache import redis_cached, get_task_generation, task_cache_key, invalidate_task_cache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+TASK_COUNT_TTL = 30
+
+# Columns serialized by the task list, matching TaskResponse
+TASK_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.priority,
+    Task.due_date,
+    Task.owner_id,
+    Task.completed_at,
+    Task.created_at,
+    Task.updated_at,
+)
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    """Encode the (created_at, id) position of a task as an opaque cursor."""
+    raw = json.dumps([created_at.isoformat(), task_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+async def count_tasks(redis: Redis, db: AsyncSession, query, user_id: int, filters: dict) -> int:
+    """Count tasks matching a filtered query, cached briefly per owner and filter set."""
+    try:
+        generation = await get_task_generation(redis, user_id)
+        key = task_cache_key(user_id, generation, "total", filters)
+        cached = await redis.get(key)
+    except RedisError:
+        logger.warning("Task count cache read failed; counting uncached", exc_info=True)
+        key = cached = None
+    
+    if cached is not None:
+        return int(cached)
+    
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    if key is not None:
+        try:
+            await redis.setex(key, TASK_COUNT_TTL, total)
+        except RedisError:
+            logger.warning("Task count cache write failed", exc_info=True)
+    return total
+
+async def get_owned_task(db: AsyncSession, task_id: int, user_id: int) -> Task:
+    """Load a task owned by the user or raise 404."""
+    task = await db.scalar(
+        select(Task).where(Task.id == task_id, Task.owner_id == user_id)
+    )
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    return task
+
+async def update_owned_task(db: AsyncSession, task_id: int, user_id: int, values: dict) -> Task:
+    """Update a task owned by the user in one UPDATE ... RETURNING or raise 404."""
+    result = await db.execute(
+        update(Task)
+        .where(Task.id == task_id, Task.owner_id == user_id)
+        .values(**values)
+        .returning(Task)
+    )
+    task = result.scalar_one_or_none()
+    
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+    
+    return task
 
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
     """Create a new task."""
-    task = Task(
-        title=task_data.title,
-        description=task_data.description,
-        status=task_data.status,
-        priority=task_data.priority,
-        due_date=task_data.due_date,
-        owner_id=current_user.id
+    task = await db.scalar(
+        insert(Task).values(
+            title=task_data.title,
+            description=task_data.description,
+            status=task_data.status,
+            priority=task_data.priority,
+            due_date=task_data.due_date,
+            owner_id=user_id
+        ).returning(Task)
     )
-    
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await invalidate_task_cache(redis, user_id)
     return task
 
-@router.get("/", response_model=TaskListResponse)
+@router.get("/", response_model=None, responses={200: {"model": TaskListResponse}})
+@redis_cached("list")
 async def get_tasks(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
     status: Optional[TaskStatus] = None,
     priority: Optional[TaskPriority] = None,
     search: Optional[str] = None,
     sort_by: str = Query("created_at"),
     sort_order: str = Query("desc"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
-    """Get user's tasks with filtering and pagination."""
-    query = db.query(Task).filter(Task.owner_id == current_user.id)
+    """Get user's tasks with filtering and pagination.
+    
+    Passing the returned next_cursor seeks past the previous page instead of
+    offsetting, which keeps deep pages as cheap as the first one. Rows are
+    selected as plain columns and returned as dicts, skipping ORM hydration
+    and TaskResponse validation.
+    """
+    query = select(*TASK_COLUMNS).where(Task.owner_id == user_id)
     
     # Apply filters
     if status:
-        query = query.filter(Task.status == status)
+        query = query.where(Task.status == status)
     if priority:
-        query = query.filter(Task.priority == priority)
+        query = query.where(Task.priority == priority)
     if search:
-        query = query.filter(Task.title.ilike(f"%{search}%"))
-    
-    # Apply sorting
-    if sort_order == "desc":
-        query = query.order_by(desc(getattr(Task, sort_by)))
-    else:
-        query = query.order_by(asc(getattr(Task, sort_by)))
+        query = query.where(func.lower(Task.title).like(f"%{search.lower()}%"))
     
     # Get total count
-    total = query.count()
+    total = None
+    if include_total:
+        filters = {"status": status, "priority": priority, "search": search}
+        total = await count_tasks(redis, db, query, user_id, filters)
+    
+    # Apply sorting, with id as a tie-breaker so cursors are unambiguous
+    sort_column = getattr(Task, sort_by)
+    order = desc if sort_order == "desc" else asc
+    query = query.order_by(order(sort_column), order(Task.id))
     
     # Apply pagination
-    tasks = query.offset((page - 1) * per_page).limit(per_page).all()
+    if cursor:
+        if sort_by != "created_at":
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination is only supported when sorting by created_at"
+            )
+        last_created_at, last_id = decode_cursor(cursor)
+        position = tuple_(Task.created_at, Task.id)
+        if sort_order == "desc":
+            query = query.where(position < tuple_(last_created_at, last_id))
+        else:
+            query = query.where(position > tuple_(last_created_at, last_id))
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    result = await db.execute(query.limit(per_page + 1))
+    tasks = [dict(row._mapping) for row in result]
+    
+    next_cursor = None
+    if len(tasks) > per_page:
+        tasks = tasks[:per_page]
+        if sort_by == "created_at":
+            next_cursor = encode_cursor(tasks[-1]["created_at"], tasks[-1]["id"])
     
     # Calculate total pages
-    total_pages = (total + per_page - 1) // per_page
-    
-    return TaskListResponse(
-        tasks=tasks,
-        total=total,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages
-    )
+    total_pages = (total + per_page - 1) // per_page if total is not None else None
+    
+    return {
+        "tasks": tasks,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor
+    }
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific task by ID."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.owner_id == current_user.id
-    ).first()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    return task
+    return await get_owned_task(db, task_id, user_id)
 
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
     """Update a specific task."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.owner_id == current_user.id
-    ).first()
-    
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    # Update task fields
-    update_data = task_update.dict(exclude_unset=True)
+    update_data = task_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_owned_task(db, task_id, user_id)
     
     # Handle status change to completed
     if "status" in update_data and update_data["status"] == TaskStatus.COMPLETED:
-        update_data["completed_at"] = datetime.utcnow()
+        update_data["completed_at"] = datetime.now(timezone.utc)
     elif "status" in update_data and update_data["status"] != TaskStatus.COMPLETED:
         update_data["completed_at"] = None
     
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    task = await update_owned_task(db, task_id, user_id, update_data)
     
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await invalidate_task_cache(redis, user_id)
     return task
 
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
     """Delete a specific task."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.owner_id == current_user.id
-    ).first()
+    deleted_id = await db.scalar(
+        delete(Task).where(Task.id == task_id, Task.owner_id == user_id).returning(Task.id)
+    )
     
-    if not task:
+    if deleted_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    db.delete(task)
-    db.commit()
+    await db.commit()
+    await invalidate_task_cache(redis, user_id)
     return {"message": "Task deleted successfully"}
 
 @router.patch("/{task_id}/complete", response_model=TaskResponse)
 async def complete_task(
     task_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
     """Mark a task as completed."""
-    task = db.query(Task).filter(
-        Task.id == task_id,
-        Task.owner_id == current_user.id
-    ).first()
+    task = await update_owned_task(db, task_id, user_id, {
+        "status": TaskStatus.COMPLETED,
+        "completed_at": datetime.now(timezone.utc)
+    })
     
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-    
-    task.status = TaskStatus.COMPLETED
-    task.completed_at = datetime.utcnow()
-    
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await invalidate_task_cache(redis, user_id)
     return task
 
 @router.get("/stats/summary")
+@redis_cached("stats")
 async def get_task_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    redis: Redis = Depends(get_redis)
 ):
     """Get task statistics for the current user."""
-    total_tasks = db.query(Task).filter(Task.owner_id == current_user.id).count()
-    completed_tasks = db.query(Task).filter(
-        Task.owner_id == current_user.id,
-        Task.status == TaskStatus.COMPLETED
-    ).count()
-    pending_tasks = db.query(Task).filter(
-        Task.owner_id == current_user.id,
-        Task.status.in_([TaskStatus.TODO, TaskStatus.IN_PROGRESS])
-    ).count()
-    
-    # Tasks by priority
-    priority_stats = {}
-    for priority in TaskPriority:
-        count = db.query(Task).filter(
-            Task.owner_id == current_user.id,
-            Task.priority == priority
-        ).count()
-        priority_stats[priority.value] = count
-    
-    # Tasks by status
-    status_stats = {}
-    for status in TaskStatus:
-        count = db.query(Task).filter(
-            Task.owner_id == current_user.id,
-            Task.status == status
-        ).count()
-        status_stats[status.value] = count
+    result = await db.execute(
+        select(Task.status, Task.priority, func.count())
+        .where(Task.owner_id == user_id)
+        .group_by(Task.status, Task.priority)
+    )
+    
+    priority_stats = {priority.value: 0 for priority in TaskPriority}
+    status_stats = {status.value: 0 for status in TaskStatus}
+    for task_status, task_priority, count in result.all():
+        priority_stats[task_priority.value] += count
+        status_stats[task_status.value] += count
+    
+    total_tasks = sum(status_stats.values())
+    completed_tasks = status_stats[TaskStatus.COMPLETED.value]
+    pending_tasks = status_stats[TaskStatus.TODO.value] + status_stats[TaskStatus.IN_PROGRESS.value]
     
     return {
         "total_tasks": total_tasks,
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, invalidate_user_cache, revoke_user_tokens
 
 router = APIRouter()
 
@@ -18,25 +18,27 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user information."""
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True)
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_user_cache(current_user.id)
     return current_user
 
 @router.delete("/me")
 async def delete_current_user(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete current user account."""
     # Soft delete - deactivate account
     current_user.is_active = False
-    db.commit()
+    await db.commit()
+    revoke_user_tokens(current_user.id)
     return {"message": "Account deactivated successfully"}
@@ -32,7 +32,8 @@ class TaskResponse(TaskBase):
 
 class TaskListResponse(BaseModel):
     tasks: list[TaskResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
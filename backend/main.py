@@ -1,39 +1,40 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
-import redis.asyncio as redis
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import httpx
 import os
 from dotenv import load_dotenv
 
-from app.database import get_db
+from app.database import get_db, engine
 from app.routers import auth, tasks, users
 from app.core.config import settings
-from app.core.redis_client import get_redis
+from app.core.redis_client import create_redis
 
 load_dotenv()
 
-# Create database engine
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    app.state.redis = await redis.from_url(settings.REDIS_URL)
+    app.state.redis = create_redis()
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=5.0,
+        limits=httpx.Limits(max_keepalive_connections=50)
+    )
     yield
     # Shutdown
+    await app.state.http.aclose()
     await app.state.redis.close()
+    await engine.dispose()
 
 app = FastAPI(
     title="Task Management API",
     description="A comprehensive task management application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
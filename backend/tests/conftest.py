@@ -0,0 +1,74 @@
+import os
+import pytest
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from main import app
+from app.database import Base, get_db
+from app.models.user import User
+from app.core.redis_client import get_redis
+from app.core.security import create_access_token
+from app.routers import auth
+
+@pytest.fixture(autouse=True)
+def reset_token_caches():
+    """Keep cached and revoked tokens from leaking between tests that reuse user ids."""
+    yield
+    auth._token_cache.clear()
+    auth._revoked_at.clear()
+
+# Tests drop every table when they finish, so they never touch DATABASE_URL
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """Create the schema in the test database and drop it afterwards."""
+    database = make_url(TEST_DATABASE_URL).database if TEST_DATABASE_URL else None
+    if not database or "test" not in database:
+        pytest.fail("TEST_DATABASE_URL must name a dedicated test database, e.g. .../task_management_test")
+    
+    engine = create_async_engine(TEST_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+@pytest_asyncio.fixture
+async def redis():
+    client = FakeRedis()
+    yield client
+    await client.flushall()
+
+@pytest_asyncio.fixture
+async def client(session_factory, db, redis):
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+    
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_redis] = lambda: redis
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest_asyncio.fixture
+async def user(db):
+    user = User(email="owner@example.com", username="owner", provider="local")
+    db.add(user)
+    await db.commit()
+    return user
+
+@pytest.fixture
+def auth_headers(user):
+    token = create_access_token({"user_id": user.id, "email": user.email})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.security import create_access_token
+from app.routers.auth import _is_revoked, _revoked_at, get_current_user, get_current_user_id, revoke_user_tokens
+
+def test_revocation_is_exact_within_a_second():
+    _revoked_at[1] = 1000.5
+    assert _is_revoked({"user_id": 1, "iat": 1000.25})
+    assert not _is_revoked({"user_id": 1, "iat": 1000.75})
+    assert not _is_revoked({"user_id": 2, "iat": 1000.25})
+
+@pytest.mark.asyncio
+async def test_logout_revokes_the_calling_token(client, user, auth_headers):
+    assert (await client.get("/api/tasks/", headers=auth_headers)).status_code == 200
+    
+    response = await client.post("/api/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+    
+    assert (await client.get("/api/tasks/", headers=auth_headers)).status_code == 401
+    assert (await client.delete("/api/users/me", headers=auth_headers)).status_code == 401
+
+@pytest.mark.asyncio
+async def test_token_issued_after_logout_is_accepted(client, user, auth_headers):
+    await client.post("/api/auth/logout", headers=auth_headers)
+    
+    token = create_access_token({"user_id": user.id, "email": user.email})
+    response = await client.get("/api/tasks/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_deactivation_revokes_tokens(client, user, auth_headers):
+    # Load the user once so the token cache holds a snapshot
+    assert (await client.get("/api/users/me", headers=auth_headers)).status_code == 200
+    
+    response = await client.delete("/api/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    
+    assert (await client.get("/api/users/me", headers=auth_headers)).status_code == 401
+    assert (await client.get("/api/tasks/", headers=auth_headers)).status_code == 401
+
+class RevokingSession:
+    """Session whose user lookup races a logout."""
+
+    def __init__(self, user):
+        self.user = user
+
+    async def get(self, model, user_id):
+        revoke_user_tokens(user_id)
+        return self.user
+
+@pytest.mark.asyncio
+async def test_revocation_during_user_load_is_not_undone(user):
+    token = create_access_token({"user_id": user.id, "email": user.email})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    
+    await get_current_user(credentials, RevokingSession(user))
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user_id(credentials)
+    assert exc_info.value.status_code == 401
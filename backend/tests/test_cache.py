@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import insert
+from redis.exceptions import RedisError
+
+from main import app
+from app.models.task import Task
+from app.core.cache import task_generation_key
+from app.core.redis_client import get_redis
+
+class BrokenRedis:
+    """Redis stand-in whose every command fails."""
+
+    async def get(self, *args, **kwargs):
+        raise RedisError("redis is down")
+
+    async def setex(self, *args, **kwargs):
+        raise RedisError("redis is down")
+
+    def pipeline(self, *args, **kwargs):
+        raise RedisError("redis is down")
+
+def test_openapi_exposes_endpoint_parameters():
+    """functools.wraps must let FastAPI see the endpoint's own signature."""
+    operation = app.openapi()["paths"]["/api/tasks/"]["get"]
+    names = {param["name"] for param in operation["parameters"]}
+    assert {"cursor", "include_total", "per_page", "sort_by"} <= names
+    assert "kwargs" not in names
+
+@pytest.mark.asyncio
+async def test_list_is_served_from_cache(client, db, user, auth_headers):
+    first = await client.get("/api/tasks/", headers=auth_headers)
+    assert first.json()["tasks"] == []
+    
+    # A row written behind the API's back is not seen until the cache is invalidated
+    await db.execute(insert(Task).values(title="Hidden", owner_id=user.id))
+    await db.commit()
+    second = await client.get("/api/tasks/", headers=auth_headers)
+    assert second.content == first.content
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_responses(client, redis, user, auth_headers):
+    generation_key = task_generation_key(user.id)
+
+    async def list_titles():
+        response = await client.get("/api/tasks/", headers=auth_headers)
+        return [task["title"] for task in response.json()["tasks"]]
+
+    async def stats():
+        response = await client.get("/api/tasks/stats/summary", headers=auth_headers)
+        return response.json()
+    
+    assert await list_titles() == []
+    assert (await stats())["total_tasks"] == 0
+    
+    response = await client.post("/api/tasks/", json={"title": "Write tests"}, headers=auth_headers)
+    assert response.status_code == 200
+    task_id = response.json()["id"]
+    assert int(await redis.get(generation_key)) == 1
+    assert await list_titles() == ["Write tests"]
+    assert (await stats())["total_tasks"] == 1
+    
+    response = await client.put(f"/api/tasks/{task_id}", json={"title": "Write more tests"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert int(await redis.get(generation_key)) == 2
+    assert await list_titles() == ["Write more tests"]
+    
+    response = await client.patch(f"/api/tasks/{task_id}/complete", headers=auth_headers)
+    assert response.status_code == 200
+    assert int(await redis.get(generation_key)) == 3
+    assert (await stats())["completed_tasks"] == 1
+    
+    response = await client.delete(f"/api/tasks/{task_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert int(await redis.get(generation_key)) == 4
+    assert await list_titles() == []
+    assert (await stats())["total_tasks"] == 0
+
+@pytest.mark.asyncio
+async def test_cache_is_scoped_to_owner(client, db, redis, user, auth_headers):
+    await client.get("/api/tasks/", headers=auth_headers)
+    await client.post("/api/tasks/", json={"title": "Mine"}, headers=auth_headers)
+    
+    keys = [key.decode() async for key in redis.scan_iter("tasks:*")]
+    assert keys and all(key.startswith(f"tasks:{user.id}:") for key in keys)
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_through_to_database(client, user, auth_headers):
+    app.dependency_overrides[get_redis] = lambda: BrokenRedis()
+    
+    response = await client.post("/api/tasks/", json={"title": "Still saved"}, headers=auth_headers)
+    assert response.status_code == 200
+    
+    response = await client.get("/api/tasks/", params={"include_total": True}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    
+    response = await client.get("/api/tasks/stats/summary", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total_tasks"] == 1
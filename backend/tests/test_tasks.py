@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.models.task import Task
+from app.routers.tasks import encode_cursor, decode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24=", "WzFd", "WyJub3QgYSBkYXRlIiwgMV0="])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+async def insert_tasks(db, user, timestamps):
+    """Insert one task per timestamp and return their ids."""
+    ids = []
+    for index, created_at in enumerate(timestamps):
+        task_id = await db.scalar(
+            insert(Task).values(title=f"Task {index}", owner_id=user.id, created_at=created_at).returning(Task.id)
+        )
+        ids.append(task_id)
+    await db.commit()
+    return ids
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort_order", ["desc", "asc"])
+async def test_cursor_pages_cover_every_task_once(client, db, user, auth_headers, sort_order):
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # Several tasks share a timestamp so the id tie-breaker is exercised
+    timestamps = [base, base, base, base + timedelta(minutes=1), base + timedelta(minutes=2), base + timedelta(minutes=2), base + timedelta(minutes=3)]
+    ids = await insert_tasks(db, user, timestamps)
+    expected = [task_id for _, task_id in sorted(zip(timestamps, ids), reverse=sort_order == "desc")]
+    
+    seen = []
+    params = {"per_page": 3, "sort_order": sort_order}
+    while True:
+        response = await client.get("/api/tasks/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(task["id"] for task in body["tasks"])
+        if not body["next_cursor"]:
+            break
+        params["cursor"] = body["next_cursor"]
+    
+    assert seen == expected
+
+@pytest.mark.asyncio
+async def test_include_total(client, db, user, auth_headers):
+    await insert_tasks(db, user, [datetime(2024, 1, 1, tzinfo=timezone.utc)] * 5)
+    
+    response = await client.get("/api/tasks/", params={"per_page": 2}, headers=auth_headers)
+    assert response.json()["total"] is None
+    
+    response = await client.get("/api/tasks/", params={"per_page": 2, "include_total": True}, headers=auth_headers)
+    body = response.json()
+    assert body["total"] == 5
+    assert body["total_pages"] == 3
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_returns_400(client, user, auth_headers):
+    response = await client.get("/api/tasks/", params={"cursor": "garbage"}, headers=auth_headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_cursor_requires_created_at_sort(client, user, auth_headers):
+    cursor = encode_cursor(datetime(2024, 1, 1, tzinfo=timezone.utc), 1)
+    response = await client.get("/api/tasks/", params={"cursor": cursor, "sort_by": "title"}, headers=auth_headers)
+    assert response.status_code == 400
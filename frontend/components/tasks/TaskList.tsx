@@ -18,6 +18,7 @@ export function TaskList({ onEditTask, onStatsUpdate }: TaskListProps) {
   const [filters, setFilters] = useState({
     page: 1,
     per_page: 10,
+    include_total: true,
     status: '',
     priority: '',
     search: '',
@@ -35,8 +36,8 @@ export function TaskList({ onEditTask, onStatsUpdate }: TaskListProps) {
       const response: TaskListResponse = await taskAPI.getTasks(filters)
       setTasks(response.tasks)
       setPagination({
-        total: response.total,
-        total_pages: response.total_pages,
+        total: response.total ?? 0,
+        total_pages: response.total_pages ?? 0,
       })
       
       // Update stats
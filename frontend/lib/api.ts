@@ -107,6 +107,8 @@ export const taskAPI = {
   getTasks: async (params?: {
     page?: number
     per_page?: number
+    cursor?: string
+    include_total?: boolean
     status?: string
     priority?: string
     search?: string
@@ -41,10 +41,11 @@ export enum TaskPriority {
 
 export interface TaskListResponse {
   tasks: Task[]
-  total: number
+  total: number | null
   page: number
   per_page: number
-  total_pages: number
+  total_pages: number | null
+  next_cursor: string | null
 }
 
 export interface TaskStats {